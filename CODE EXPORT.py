@@ -1,111 +1,1008 @@
 import os
+import re
+import sys
+import json
+import codecs
+import collections
+import time
+import gzip
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
-def export_project_code(output_filename="project_code_export.txt"):
+# Directories and files to exclude
+EXCLUDE_DIRS = [
+    ".git",
+    ".next",
+    "node_modules",
+    "public",
+    "__pycache__",
+    ".vscode",
+    "data",  # Database data directory
+    "snapshots",  # Database snapshots created by MANAGER.py
+]
+EXCLUDE_FILES = [
+    ".gitignore",
+    "package-lock.json",  # Keep package.json for dependencies info
+    "tsconfig.tsbuildinfo",  # Build info file
+    "next-env.d.ts",  # Auto-generated
+    "README.md",  # Documentation
+    # Log files (keep some for debugging if needed)
+    "bot_logs_admin.json",
+    "bot-status.json",
+    "buy_log_admin.json",
+    "buy_log_demo.json",
+    "decision_log_admin.json",
+    "decision_log_demo.json",
+    "missed_opportunities_admin.json",
+    "missed_opportunities_demo.json",
+    "opportunities.json",
+    "portfolio_admin.json",
+    "portfolio_demo.json",
+    "trades_log_admin.json",
+    "trades_log_demo.json",
+    "users.json",
+    "CODE EXPORT.py", # Exclude the script itself
+]
+
+# File extensions to include (common code files)
+INCLUDE_EXTENSIONS = [
+    ".ts", ".tsx", ".js", ".jsx", ".py", ".css", ".html", ".json", # Include .json for config/data files
+    ".yml", ".yaml", # Docker Compose files
+    ".dockerfile", ".Dockerfile", # Dockerfile
+    ".dockerignore", # Docker ignore file
+    ".env", ".env.example", ".env.local", # Environment files
+    ".md", # Documentation files
+    ".prisma", # Prisma schema
+    ".toml", ".lock", # Dependency files
+    ".config.js", ".config.ts", # Config files
+]
+
+INCLUDE_SUFFIXES = tuple(INCLUDE_EXTENSIONS)
+
+# Ignore files honoured by the walker, and whether their patterns are anchored
+# to the directory they live in (.dockerignore) or match at any depth (.gitignore)
+IGNORE_FILES = ((".gitignore", False), (".dockerignore", True))
+# Sources the export wants even though .dockerignore keeps them out of the image
+IGNORE_OVERRIDES = [
+    "tests", "__tests__", "*.md", "Dockerfile*", "docker-compose*", ".dockerignore",
+    "jest.config.ts", "jest.setup.ts",
+]
+MAX_FILE_SIZE = 20 * 1024 * 1024  # Larger files are skipped as data dumps
+SNIFF_BYTES = 8192  # Header read used to detect binary files
+
+# Specific important files to always include (even if extension not in include_extensions)
+IMPORTANT_FILES = [
+    "Dockerfile",
+    "docker-compose.yml",
+    "docker-compose.override.yml",
+    ".dockerignore",
+    ".env",
+    ".env.example",
+    ".env.local",
+    "package.json",
+    "tsconfig.json",
+    "tsconfig.worker.json",
+    "prisma/schema.prisma",
+    "jest.config.ts",
+    "tailwind.config.ts",
+    "next.config.ts",
+    "postcss.config.mjs",
+    "eslint.config.mjs",
+]
+
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 3
+INDEX_SUFFIX = ".index.json"  # Random-access index read by export_reader.py
+INDEX_VERSION = 1
+TOC_SUFFIX = ".toc.txt"  # Table of contents written next to split parts
+
+# Pipeline tuning: files are read on a thread pool at most READ_AHEAD files
+# ahead of the writer; files above STREAM_THRESHOLD are streamed in chunks.
+READ_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+READ_AHEAD = READ_WORKERS * 4
+STREAM_THRESHOLD = 1024 * 1024
+CHUNK_SIZE = 256 * 1024
+GZIP_LEVEL = 6
+BYTES_PER_TOKEN = 4  # Rough estimate used to turn --max-part-tokens into bytes
+PART_MIN_BYTES = 4096
+PART_MIN_PIECE = 1024  # Don't start a split file with less than this left in a part
+
+# Compact mode: JSON data files above JSON_SAMPLE_BYTES are replaced by a
+# sample of their structure (IMPORTANT_FILES such as package.json are kept)
+JSON_SAMPLE_BYTES = 16 * 1024
+JSON_HEAD_BYTES = 64 * 1024  # Only this much of a streamed (huge) JSON file is read for its summary
+JSON_SAMPLE_ITEMS = 3
+JSON_SAMPLE_KEYS = 20
+JSON_SAMPLE_DEPTH = 4
+JSON_SAMPLE_STRING = 200
+REPORT_TOP = 20
+
+# Language tags written to the index, by extension or by exact file name
+LANGUAGES = {
+    ".ts": "typescript", ".tsx": "tsx", ".js": "javascript", ".jsx": "jsx", ".mjs": "javascript",
+    ".py": "python", ".css": "css", ".html": "html", ".json": "json", ".yml": "yaml", ".yaml": "yaml",
+    ".md": "markdown", ".prisma": "prisma", ".toml": "toml", ".sh": "shell", ".sql": "sql",
+}
+LANGUAGE_FILENAMES = {
+    "Dockerfile": "dockerfile",
+    ".dockerignore": "ignore",
+    ".gitignore": "ignore",
+}
+
+
+def detect_language(filename):
+    if filename in LANGUAGE_FILENAMES:
+        return LANGUAGE_FILENAMES[filename]
+    if filename.startswith(".env"):
+        return "dotenv"
+    return LANGUAGES.get(os.path.splitext(filename)[1].lower(), "text")
+
+
+def glob_to_regex(pattern):
+    """Translates one gitignore-style glob (without leading / or trailing /) into a regex fragment."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            close = pattern.find("]", i + 2 if pattern.startswith("[!", i) or pattern.startswith("[^", i) else i + 1)
+            if close == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:close]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = close
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """
+    Compiled patterns from one ignore file. Runs of consecutive patterns with
+    the same kind (negated or not, directory-only or not) are merged into a
+    single regex, so matching costs a handful of regex calls regardless of the
+    number of patterns, while "last matching pattern wins" still holds.
+
+    Patterns follow .gitignore rules: a pattern without a slash matches at any
+    depth below ``base``. With ``anchored=True`` (.dockerignore rules) every
+    pattern is relative to ``base``.
+    """
+
+    def __init__(self, lines, base="", anchored=False):
+        self.base = base + "/" if base else ""
+        self.groups = []  # [(negate, dir_only, [regex fragments])]
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.strip("/") if anchored else line.rstrip("/")
+            if not line:
+                continue
+            if line.startswith("/") or "/" in line or anchored:
+                fragment = glob_to_regex(line.lstrip("/"))
+            else:
+                fragment = "(?:.*/)?" + glob_to_regex(line)
+            if self.groups and self.groups[-1][:2] == (negate, dir_only):
+                self.groups[-1][2].append(fragment)
+            else:
+                self.groups.append((negate, dir_only, [fragment]))
+        # A pattern also covers everything below a matching directory
+        self.groups = [
+            (negate, dir_only, re.compile("(?:" + "|".join(fragments) + ")" + ("" if dir_only else "(?:/.*)?") + r"\Z"))
+            for negate, dir_only, fragments in self.groups
+        ]
+
+    @classmethod
+    def from_file(cls, path, base="", anchored=False):
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return cls(f, base, anchored)
+        except OSError:
+            return None
+
+    def match(self, relative_path, is_dir):
+        """Returns True (ignored), False (re-included by a ! pattern) or None (no pattern matches)."""
+        if not relative_path.startswith(self.base):
+            return None
+        path = relative_path[len(self.base):]
+        for negate, dir_only, regex in reversed(self.groups):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(path):
+                return not negate
+        return None
+
+    def __bool__(self):
+        return bool(self.groups)
+
+
+def is_ignored(rules, relative_path, is_dir):
+    # Deeper ignore files take precedence over the ones above them
+    for rule in reversed(rules):
+        result = rule.match(relative_path, is_dir)
+        if result is not None:
+            return result
+    return False
+
+
+def sniff_binary(filepath):
+    """Reads only the start of a file and tells whether it looks binary (NUL bytes or invalid UTF-8)."""
+    with open(filepath, "rb") as f:
+        header = f.read(SNIFF_BYTES)
+    if b"\0" in header:
+        return True
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(header, final=False)
+    except UnicodeDecodeError:
+        return True
+    return False
+
+
+def collect_files(root_dir, output_filename, skipped=None, use_ignore_files=True, max_file_size=MAX_FILE_SIZE):
+    """
+    Yields (filepath, relative_filepath, stat) for every file that belongs in
+    the export, in a stable (sorted, depth-first) order.
+
+    Built on os.scandir with an explicit stack. EXCLUDE_DIRS and directories
+    matched by .gitignore/.dockerignore patterns (see IGNORE_FILES) are pruned
+    before they are entered, so an ignored node_modules costs one check.
+    IMPORTANT_FILES and IGNORE_OVERRIDES are kept regardless of ignore files.
+    Each skipped entry is counted by reason in the ``skipped`` Counter.
+    """
+    if skipped is None:
+        skipped = collections.Counter()
+    exclude_files = set(EXCLUDE_FILES) | {
+        output_filename, output_filename + MANIFEST_SUFFIX, output_filename + INDEX_SUFFIX, toc_path_for(output_filename),
+    }
+    part_prefix = part_name_parts(output_filename)[0] + ".part"
+    exclude_dirs = set(EXCLUDE_DIRS)
+    overrides = IgnoreRules(IGNORE_OVERRIDES)
+
+    stack = [(root_dir, "", [])]
+    while stack:
+        dirpath, relative_dir, rules = stack.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            skipped["unreadable"] += 1
+            continue
+
+        if use_ignore_files:
+            names = {entry.name for entry in entries}
+            for ignore_file, anchored in IGNORE_FILES:
+                # .dockerignore only applies at the root of the build context
+                if ignore_file in names and not (anchored and relative_dir):
+                    rule = IgnoreRules.from_file(os.path.join(dirpath, ignore_file), relative_dir, anchored)
+                    if rule:
+                        rules = rules + [rule]
+
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            relative_path = relative_dir + "/" + name if relative_dir else name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                skipped["unreadable"] += 1
+                continue
+            if is_dir:
+                if name in exclude_dirs:
+                    skipped["excluded directories"] += 1
+                elif is_ignored(rules, relative_path, True) and overrides.match(relative_path, True) is None:
+                    skipped["ignored directories"] += 1
+                else:
+                    subdirs.append((entry.path, relative_path))
+                continue
+
+            # Always include important files
+            if name in IMPORTANT_FILES or relative_path in IMPORTANT_FILES:
+                pass
+            elif name in exclude_files or name.startswith(part_prefix):
+                skipped["excluded"] += 1  # Excluded files and our own outputs
+                continue
+            elif not name.endswith(INCLUDE_SUFFIXES):
+                # Suffix match, so multi-part extensions like .config.js work
+                skipped["extension"] += 1
+                continue
+            elif is_ignored(rules, relative_path, False) and overrides.match(relative_path, False) is None:
+                skipped["ignored"] += 1
+                continue
+
+            try:
+                st = entry.stat()
+            except OSError:
+                skipped["unreadable"] += 1
+                continue
+            if max_file_size and st.st_size > max_file_size:
+                skipped["oversized"] += 1
+                continue
+            yield entry.path, relative_path.replace("/", os.sep), st
+
+        # Push in reverse so subdirectories are visited in sorted order
+        for subdir, relative_subdir in reversed(subdirs):
+            stack.append((subdir, relative_subdir, rules))
+
+
+def format_skipped(skipped):
+    return ", ".join(f"{count} {reason}" for reason, count in sorted(skipped.items(), key=lambda item: -item[1]))
+
+
+def part_name_parts(output_filename):
+    """
+    Splits an output name into (prefix, suffix) for numbered parts, e.g.
+    project_code_export.txt.gz -> ("project_code_export", ".txt.gz").
+    """
+    base, compressed = (output_filename[:-3], ".gz") if output_filename.endswith(".gz") else (output_filename, "")
+    prefix, ext = os.path.splitext(base)
+    return prefix, ext + compressed
+
+
+def toc_path_for(output_filename):
+    return part_name_parts(output_filename)[0] + TOC_SUFFIX
+
+
+def file_header(relative_filepath, continued=False):
+    note = " (continued)" if continued else ""
+    return f"--- FILE: {relative_filepath}{note} ---\n".encode("utf-8")
+
+
+def file_footer(relative_filepath, last=True):
+    if last:
+        return f"\n--- END FILE: {relative_filepath} ---\n\n".encode("utf-8")
+    return f"\n--- CONTINUES IN NEXT PART: {relative_filepath} ---\n\n".encode("utf-8")
+
+
+def open_output(path, compress):
+    return gzip.open(path, "wb", compresslevel=GZIP_LEVEL) if compress else open(path, "wb")
+
+
+def open_input(path):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+
+C_STYLE_COMMENTS = {"typescript", "tsx", "javascript", "jsx", "css", "prisma"}
+# JSX text is free-form, so a // there cannot be told apart from a comment
+JSX_LANGUAGES = {"tsx", "jsx"}
+HASH_COMMENTS = {"python", "yaml", "toml", "shell", "dotenv", "dockerfile", "ignore"}
+# Characters after which a "/" starts a regex literal rather than a division
+REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+
+
+def strip_c_style(text, line_comments=True, regexes=True):
+    """
+    Removes // and /* */ comments outside string, template and regex
+    literals. A // only starts a comment at the start of a line or after
+    whitespace or punctuation, so URLs such as http://x in code survive.
+    JSX text can hold " // " too, so callers keep line comments for tsx/jsx.
+    """
+    out = []
+    i, n = 0, len(text)
+    last = ""  # Last significant character emitted
+    while i < n:
+        c = text[i]
+        if c in "'\"`":
+            # Quoted strings end at the line break; template literals may span lines
+            j = i + 1
+            while j < n and text[j] != c and (c == "`" or text[j] != "\n"):
+                j += 2 if text[j] == "\\" else 1
+            out.append(text[i:j + 1])
+            i = j + 1
+            last = c
+            continue
+        if c == "/" and i + 1 < n:
+            following = text[i + 1]
+            if following == "*":
+                end = text.find("*/", i + 2)
+                i = n if end == -1 else end + 2
+                continue
+            previous = out[-1][-1:] if out else ""
+            if following == "/" and line_comments and (previous == "" or previous in " \t\n;{}),"):
+                end = text.find("\n", i)
+                i = n if end == -1 else end
+                continue
+            if following != "/" and regexes and (last == "" or last in REGEX_PRECEDERS):
+                j = i + 1
+                in_class = False
+                while j < n and text[j] != "\n" and (text[j] != "/" or in_class):
+                    if text[j] == "\\":
+                        j += 1
+                    elif text[j] == "[":
+                        in_class = True
+                    elif text[j] == "]":
+                        in_class = False
+                    j += 1
+                out.append(text[i:j + 1])
+                i = j + 1
+                last = "/"
+                continue
+        out.append(c)
+        if not c.isspace():
+            last = c
+        i += 1
+    return "".join(out)
+
+
+def strip_comments(text, language):
+    """Drops comments and blank lines for languages where that is safe; collapses blank runs elsewhere."""
+    if language in C_STYLE_COMMENTS:
+        text = strip_c_style(text, line_comments=language not in JSX_LANGUAGES, regexes=language != "css")
+    elif language in HASH_COMMENTS:
+        text = "\n".join(
+            line for number, line in enumerate(text.split("\n"))
+            if not line.lstrip().startswith("#") or (number == 0 and line.startswith("#!"))
+        )
+    elif language == "json":
+        try:
+            return json.dumps(json.loads(text), ensure_ascii=False, separators=(",", ":"))
+        except ValueError:
+            return text  # tsconfig-style JSON with comments
+    else:
+        return re.sub(r"\n(?:[ \t]*\n)+", "\n\n", text)
+    return "\n".join(line.rstrip() for line in text.split("\n") if line.strip())
+
+
+def sample_json(value, depth=0):
+    """Keeps the shape of a JSON value while dropping most of its items."""
+    if isinstance(value, list):
+        if depth >= JSON_SAMPLE_DEPTH:
+            return f"<array of {len(value)} items>"
+        items = [sample_json(item, depth + 1) for item in value[:JSON_SAMPLE_ITEMS]]
+        if len(value) > JSON_SAMPLE_ITEMS:
+            items.append(f"<{len(value) - JSON_SAMPLE_ITEMS:,} more items>")
+        return items
+    if isinstance(value, dict):
+        if depth >= JSON_SAMPLE_DEPTH:
+            return f"<object with {len(value)} keys>"
+        keys = list(value)
+        sampled = {key: sample_json(value[key], depth + 1) for key in keys[:JSON_SAMPLE_KEYS]}
+        if len(keys) > JSON_SAMPLE_KEYS:
+            sampled["<more keys>"] = f"{len(keys) - JSON_SAMPLE_KEYS:,} more: " + ", ".join(keys[JSON_SAMPLE_KEYS:JSON_SAMPLE_KEYS * 2])
+        return sampled
+    if isinstance(value, str) and len(value) > JSON_SAMPLE_STRING:
+        return value[:JSON_SAMPLE_STRING] + "..."
+    return value
+
+
+def summarize_json(text, size):
+    """Replaces a large JSON data file by a sample of its structure, or by its head if it does not parse."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        head = text[:JSON_SAMPLE_BYTES]
+        return f"[compact: first {len(head):,} of {size:,} bytes]\n{head[:head.rfind(chr(10)) + 1 or None]}"
+    if isinstance(data, list):
+        shape = f"array of {len(data):,} items"
+    elif isinstance(data, dict):
+        shape = f"object with {len(data):,} keys"
+    else:
+        shape = type(data).__name__
+    return f"[compact: sampled {shape} from {size:,} bytes]\n" + json.dumps(sample_json(data), ensure_ascii=False, indent=1)
+
+
+def compact_text(relative_filepath, text, size, strip=False):
+    """Applies the compact-mode rewrites (JSON sampling, optional comment stripping) to one file."""
+    filename = os.path.basename(relative_filepath)
+    language = detect_language(filename)
+    if language == "json" and size > JSON_SAMPLE_BYTES and filename not in IMPORTANT_FILES:
+        return summarize_json(text, size)
+    return strip_comments(text, language) if strip else text
+
+
+class SkippedFile(Exception):
+    """Raised on the reader pool for files that are deliberately left out of the export."""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def read_file(filepath, size, relative_filepath=None, compact=None):
+    """
+    Runs on the reader pool. Returns (content, sha256) where content is the
+    encoded text of a small file, or None for a file above STREAM_THRESHOLD:
+    those are only validated and hashed here (so a decode error cannot surface
+    half-way through writing) and streamed later. Binary files are recognised
+    from their first bytes and raise SkippedFile.
+
+    ``compact`` is None or a dict of compact_text options. Compact rewrites
+    apply to files that are read whole; large JSON is summarised from its
+    first JSON_HEAD_BYTES and other large files are streamed unchanged.
+    """
+    if sniff_binary(filepath):
+        raise SkippedFile("binary")
+    with open(filepath, "r", encoding="utf-8") as infile:
+        if compact is not None and size > STREAM_THRESHOLD and detect_language(os.path.basename(filepath)) == "json":
+            content = compact_text(relative_filepath, infile.read(JSON_HEAD_BYTES), size, **compact).encode("utf-8")
+        elif size <= STREAM_THRESHOLD:
+            content = infile.read()
+            if compact is not None:
+                content = compact_text(relative_filepath, content, size, **compact)
+            content = content.encode("utf-8")
+        else:
+            digest = hashlib.sha256()
+            while True:
+                text = infile.read(CHUNK_SIZE)
+                if not text:
+                    return None, digest.hexdigest()
+                digest.update(text.encode("utf-8"))
+    return content, hashlib.sha256(content).hexdigest()
+
+
+def iter_file_chunks(filepath):
+    with open(filepath, "r", encoding="utf-8") as infile:
+        while True:
+            text = infile.read(CHUNK_SIZE)
+            if not text:
+                return
+            yield text.encode("utf-8")
+
+
+def read_reused_content(previous_export, entry):
+    """Returns a file's content from the previous export, or None if that section no longer verifies."""
+    previous_export.seek(entry["offset"])
+    section = previous_export.read(entry["length"])
+    # Guard against an edited or truncated previous export
+    if hashlib.sha256(section).hexdigest() != entry["sha256"]:
+        return None
+    return section[entry["header_length"]:entry["header_length"] + entry["content_length"]]
+
+
+class SectionWriter:
+    """Writes file sections to the export stream, tracking offsets and hashes for the manifest."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.position = 0
+
+    def begin(self, relative_filepath, size_hint=0):
+        self._path = relative_filepath
+        self._offset = self.position
+        header = file_header(relative_filepath)
+        self._header_length = len(header)
+        self._content_length = 0
+        self._section_hash = hashlib.sha256(header)
+        self._content_hash = hashlib.sha256()
+        self._emit(header)
+
+    def write(self, chunk):
+        self._section_hash.update(chunk)
+        self._content_hash.update(chunk)
+        self._content_length += len(chunk)
+        self._emit(chunk)
+
+    def end(self):
+        footer = file_footer(self._path)
+        self._section_hash.update(footer)
+        self._emit(footer)
+        return {
+            "offset": self._offset,
+            "length": self.position - self._offset,
+            "header_length": self._header_length,
+            "content_length": self._content_length,
+            "sha256": self._section_hash.hexdigest(),
+            "content_sha256": self._content_hash.hexdigest(),
+        }
+
+    def _emit(self, data):
+        self.stream.write(data)
+        self.position += len(data)
+
+
+class PartWriter:
+    """
+    Splits the export into numbered parts of at most max_bytes (uncompressed)
+    each and writes a table of contents next to them. A file that does not fit
+    in the current part moves to the next one; a file larger than a whole part
+    is cut at line boundaries and continued in the following parts.
+    """
+
+    def __init__(self, output_filepath, max_bytes, compress=False):
+        if max_bytes < PART_MIN_BYTES:
+            raise ValueError(f"Part size must be at least {PART_MIN_BYTES} bytes")
+        self.output_filepath = output_filepath
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.prefix, self.suffix = part_name_parts(output_filepath)
+        self.parts = []  # [path, size, [(relative_filepath, continued, last), ...]]
+        self._stream = None
+        self._size = 0
+
+    def begin(self, relative_filepath, size_hint=0):
+        self._path = relative_filepath
+        self._size_hint = size_hint
+        self._pending = bytearray()
+        self._continued = False
+        header = len(file_header(relative_filepath, continued=True))
+        footer = max(len(file_footer(relative_filepath, True)), len(file_footer(relative_filepath, False)))
+        self._overhead = header + footer
+
+    def write(self, chunk):
+        self._pending += chunk
+        while len(self._pending) > self._room():
+            if self._size and not self._continued and (
+                    self._room() < PART_MIN_PIECE or self._size_hint + self._overhead <= self.max_bytes):
+                # Start the file in a fresh part rather than splitting it (or leaving a sliver)
+                self._next_part()
+                continue
+            cut = self._cut(max(self._room(), 1))
+            self._piece(self._pending[:cut], last=False)
+            del self._pending[:cut]
+            self._continued = True
+            self._next_part()
+
+    def end(self):
+        if self._size and len(self._pending) > self._room():
+            self._next_part()
+        self._piece(self._pending, last=True)
+
+    def close(self):
+        """Finalises the parts, removes stale ones from a previous run and writes the table of contents."""
+        self._close_part()
+        for path, _size, _files in self.parts:
+            os.replace(path + ".tmp", path)
+        current = {path for path, _size, _files in self.parts}
+        part_dir = os.path.dirname(self.prefix) or "."
+        stale_prefix = os.path.basename(self.prefix) + ".part"
+        for name in os.listdir(part_dir):
+            path = os.path.join(part_dir, name)
+            if name.startswith(stale_prefix) and name.endswith(self.suffix) and path not in current:
+                os.remove(path)
+
+        toc_path = self.prefix + TOC_SUFFIX
+        lines = [f"Table of contents: {len(self.parts)} parts of at most {self.max_bytes:,} bytes", ""]
+        for path, size, files in self.parts:
+            lines.append(f"{os.path.basename(path)} ({size:,} bytes)")
+            for relative_filepath, continued, last in files:
+                notes = (" (continued)" if continued else "") + ("" if last else " (continues in next part)")
+                lines.append(f"  {relative_filepath}{notes}")
+            lines.append("")
+        with open(toc_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        os.replace(toc_path + ".tmp", toc_path)
+        return toc_path
+
+    def abort(self):
+        if self._stream:
+            self._stream.close()
+        for path, _size, _files in self.parts:
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+
+    def _room(self):
+        return self.max_bytes - self._size - self._overhead
+
+    def _cut(self, limit):
+        """Largest prefix of the pending data within limit, ending at a line break if possible."""
+        data = self._pending
+        cut = data.rfind(b"\n", 0, limit) + 1
+        if cut <= 0:
+            cut = limit
+            # Do not split a UTF-8 sequence
+            while 0 < cut < len(data) and data[cut] & 0xC0 == 0x80:
+                cut -= 1
+        return cut or limit
+
+    def _piece(self, data, last):
+        if self._stream is None:
+            path = f"{self.prefix}.part{len(self.parts) + 1:03d}{self.suffix}"
+            self.parts.append([path, 0, []])
+            self._stream = open_output(path + ".tmp", self.compress)
+            self._size = 0
+        for block in (file_header(self._path, self._continued), data, file_footer(self._path, last)):
+            self._stream.write(block)
+            self._size += len(block)
+        self.parts[-1][1] = self._size
+        self.parts[-1][2].append((self._path, self._continued, last))
+
+    def _next_part(self):
+        self._close_part()
+        self._size = 0
+
+    def _close_part(self):
+        if self._stream:
+            self._stream.close()
+            self._stream = None
+
+
+def write_index(index_path, output_filename, manifest):
+    """Writes the sidecar index: byte offset, length, hash and language of every file."""
+    files = []
+    for relative_filepath, entry in manifest["files"].items():
+        # A deduplicated file's content is read from its first copy
+        original = manifest["files"][entry["duplicate_of"]] if "duplicate_of" in entry else entry
+        item = {
+            "path": relative_filepath.replace(os.sep, "/"),
+            "offset": entry["offset"],
+            "length": entry["length"],
+            "content_offset": original["offset"] + original["header_length"],
+            "content_length": original["content_length"],
+            "sha256": original["content_sha256"],
+            "language": detect_language(os.path.basename(relative_filepath)),
+        }
+        if "duplicate_of" in entry:
+            item["duplicate_of"] = entry["duplicate_of"].replace(os.sep, "/")
+        files.append(item)
+    index = {
+        "version": INDEX_VERSION,
+        "export": os.path.basename(output_filename),
+        "compressed": output_filename.endswith(".gz"),
+        "options": manifest["options"],
+        "files": files,
+    }
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+
+def print_size_report(manifest, top=REPORT_TOP):
+    """Prints where the bytes of the export go: the largest files and directories, with estimated tokens."""
+    files = manifest["files"]
+    written = collections.Counter()
+    source = collections.Counter()
+    for relative_filepath, entry in files.items():
+        directories = relative_filepath.split(os.sep)[:-1]
+        for depth in range(1, len(directories) + 1):
+            directory = os.sep.join(directories[:depth]) + os.sep
+            written[directory] += entry["length"]
+            source[directory] += entry["size"]
+    total = sum(entry["length"] for entry in files.values())
+    duplicates = sum(1 for entry in files.values() if "duplicate_of" in entry)
+    print(f"Total: {total:,} bytes (~{total // BYTES_PER_TOKEN:,} tokens) from "
+          f"{sum(entry['size'] for entry in files.values()):,} source bytes in {len(files)} files"
+          + (f", {duplicates} deduplicated" if duplicates else ""))
+
+    row = "{:>12}  {:>10}  {:>12}  {}"
+    print(f"\nLargest files (top {top}):")
+    print(row.format("bytes", "~tokens", "source", "path"))
+    largest = sorted(files.items(), key=lambda item: -item[1]["length"])[:top]
+    for relative_filepath, entry in largest:
+        print(row.format(f"{entry['length']:,}", f"{entry['length'] // BYTES_PER_TOKEN:,}", f"{entry['size']:,}", relative_filepath))
+    print(f"\nLargest directories (top {top}):")
+    print(row.format("bytes", "~tokens", "source", "path"))
+    for directory, length in written.most_common(top):
+        print(row.format(f"{length:,}", f"{length // BYTES_PER_TOKEN:,}", f"{source[directory]:,}", directory))
+
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "files": {}}
+
+
+def export_project_code(output_filename="project_code_export.txt", incremental=False,
+                        compress=False, max_part_bytes=None, workers=READ_WORKERS,
+                        use_ignore_files=True, max_file_size=MAX_FILE_SIZE,
+                        compact=False, strip_comments=False, report=None):
     """
     Exports all relevant project code files into a single text file,
     excluding Next.js specific files and other non-code assets.
+
+    Files are read ahead on a thread pool but written in a stable order, so the
+    output does not depend on which read finishes first. Only READ_AHEAD files
+    are held in memory at a time and files above STREAM_THRESHOLD are streamed
+    in CHUNK_SIZE pieces. ``compress=True`` writes gzip (adding ``.gz`` to the
+    name) and ``max_part_bytes`` additionally splits the export into numbered
+    parts with a table of contents.
+
+    A manifest (path, size, mtime, content hash and section position) is kept
+    next to the export. With ``incremental=True`` files whose size and mtime
+    are unchanged are not re-read: their sections are copied from the previous
+    export. A sidecar index (see export_reader.py) is written alongside for
+    random access. Returns True if the export was (re)written.
+
+    Files are found by collect_files, which honours .gitignore/.dockerignore
+    unless ``use_ignore_files=False``; skipped files are summarised by reason.
+
+    ``compact=True`` writes files whose content is identical to an earlier
+    file as a reference to it and samples large JSON data files;
+    ``strip_comments=True`` additionally drops comments and blank lines (see
+    strip_comments). ``report=N`` prints the N largest files and directories
+    with estimated token counts.
     """
+    if compress and not output_filename.endswith(".gz"):
+        output_filename += ".gz"
     root_dir = os.getcwd()
     output_filepath = os.path.join(root_dir, output_filename)
+    manifest_path = output_filepath + MANIFEST_SUFFIX
+    index_path = output_filepath + INDEX_SUFFIX
+    toc_path = toc_path_for(output_filepath)
 
-    # Directories and files to exclude
-    exclude_dirs = [
-        ".git",
-        ".next",
-        "node_modules",
-        "public",
-        "__pycache__",
-        ".vscode",
-        "data",  # Database data directory
-    ]
-    exclude_files = [
-        ".gitignore",
-        "package-lock.json",  # Keep package.json for dependencies info
-        "tsconfig.tsbuildinfo",  # Build info file
-        "next-env.d.ts",  # Auto-generated
-        "README.md",  # Documentation
-        # Log files (keep some for debugging if needed)
-        "bot_logs_admin.json",
-        "bot-status.json",
-        "buy_log_admin.json",
-        "buy_log_demo.json",
-        "decision_log_admin.json",
-        "decision_log_demo.json",
-        "missed_opportunities_admin.json",
-        "missed_opportunities_demo.json",
-        "opportunities.json",
-        "portfolio_admin.json",
-        "portfolio_demo.json",
-        "trades_log_admin.json",
-        "trades_log_demo.json",
-        "users.json",
-        output_filename, # Exclude the output file itself
-        "CODE EXPORT.py", # Exclude the script itself
-    ]
-    
-    # File extensions to include (common code files)
-    include_extensions = [
-        ".ts", ".tsx", ".js", ".jsx", ".py", ".css", ".html", ".json", # Include .json for config/data files
-        ".yml", ".yaml", # Docker Compose files
-        ".dockerfile", ".Dockerfile", # Dockerfile
-        ".dockerignore", # Docker ignore file
-        ".env", ".env.example", ".env.local", # Environment files
-        ".md", # Documentation files
-        ".prisma", # Prisma schema
-        ".toml", ".lock", # Dependency files
-        ".config.js", ".config.ts", # Config files
-    ]
-
-    # Specific important files to always include (even if extension not in include_extensions)
-    important_files = [
-        "Dockerfile",
-        "docker-compose.yml",
-        "docker-compose.override.yml",
-        ".dockerignore",
-        ".env",
-        ".env.example",
-        ".env.local",
-        "package.json",
-        "tsconfig.json",
-        "tsconfig.worker.json",
-        "prisma/schema.prisma",
-        "jest.config.ts",
-        "tailwind.config.ts",
-        "next.config.ts",
-        "postcss.config.mjs",
-        "eslint.config.mjs",
-    ]
-
-    with open(output_filepath, "w", encoding="utf-8") as outfile:
-        for dirpath, dirnames, filenames in os.walk(root_dir):
-            # Exclude directories
-            dirnames[:] = [d for d in dirnames if d not in exclude_dirs]
-
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                relative_filepath = os.path.relpath(filepath, root_dir)
-
-                # Always include important files
-                if filename in important_files:
-                    pass  # Include this file
-                elif filename in exclude_files:
-                    continue  # Skip excluded files
-                else:
-                    # Check if file extension is in the include list
-                    _, ext = os.path.splitext(filename)
-                    if ext not in include_extensions:
+    options = {"parts": max_part_bytes, "compact": compact, "strip_comments": strip_comments}
+    compact_options = {"strip": strip_comments} if compact or strip_comments else None
+    previous = load_manifest(manifest_path) if incremental else {"version": MANIFEST_VERSION, "files": {}}
+    if previous.get("options", options) != options:
+        previous["files"] = {}  # Sections written with other options cannot be reused
+    previous_export = None
+    if previous["files"]:
+        try:
+            previous_export = open_input(output_filepath)
+        except OSError:
+            previous["files"] = {}
+
+    plan = []
+    skipped = collections.Counter()
+    for filepath, relative_filepath, st in collect_files(root_dir, output_filename, skipped, use_ignore_files, max_file_size):
+        entry = previous["files"].get(relative_filepath)
+        # Large sections are streamed from the source rather than copied, which keeps memory bounded
+        reusable = (entry is not None and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+                    and entry["length"] <= STREAM_THRESHOLD and "duplicate_of" not in entry)
+        plan.append((filepath, relative_filepath, st, entry, reusable))
+
+    manifest = {"version": MANIFEST_VERSION, "options": options, "files": {}}
+    reused = reread = 0
+    changed = not previous["files"]
+    first_copies = {}  # content sha256 -> first file with that content (compact mode)
+    tmp_filepath = output_filepath + ".tmp"
+    parts = PartWriter(output_filepath, max_part_bytes, compress) if max_part_bytes else None
+    to_read = [i for i, item in enumerate(plan) if not item[4]]
+    pending = {}
+    next_read = 0
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool, open_output(tmp_filepath, compress) as outfile:
+            sections = SectionWriter(outfile)
+            writers = (sections, parts) if parts else (sections,)
+            for i, (filepath, relative_filepath, st, entry, reusable) in enumerate(plan):
+                # Keep up to READ_AHEAD reads in flight ahead of the writer
+                while next_read < len(to_read) and len(pending) < READ_AHEAD:
+                    j = to_read[next_read]
+                    pending[j] = pool.submit(read_file, plan[j][0], plan[j][2].st_size, plan[j][1], compact_options)
+                    next_read += 1
+
+                chunks = duplicate_of = None
+                if reusable:
+                    content = read_reused_content(previous_export, entry)
+                    if content is not None:
+                        chunks = (content,)
+                        content_sha256 = entry["content_sha256"]
+                        reused += 1
+                    else:
+                        pending[i] = pool.submit(read_file, filepath, st.st_size, relative_filepath, compact_options)
+                if chunks is None:
+                    try:
+                        content, content_sha256 = pending.pop(i).result()
+                    except SkippedFile as e:
+                        skipped[e.reason] += 1
+                        continue
+                    except Exception as e:
+                        print(f"Could not read file {relative_filepath}: {e}")
+                        skipped["unreadable"] += 1
                         continue
+                    chunks = (content,) if content is not None else iter_file_chunks(filepath)
+                    reread += 1
+                if compact:
+                    duplicate_of = first_copies.setdefault(content_sha256, relative_filepath)
+                    if duplicate_of == relative_filepath:
+                        duplicate_of = None
+                    else:
+                        chunks = (f"[Same content as {duplicate_of}]".encode("utf-8"),)
+
+                for writer in writers:
+                    writer.begin(relative_filepath, st.st_size)
+                for chunk in chunks:
+                    for writer in writers:
+                        writer.write(chunk)
+                section = sections.end()
+                if parts:
+                    parts.end()
+                if not entry or entry["sha256"] != section["sha256"]:
+                    changed = True
+                manifest["files"][relative_filepath] = dict(size=st.st_size, mtime_ns=st.st_mtime_ns, **section)
+                if duplicate_of:
+                    manifest["files"][relative_filepath]["duplicate_of"] = duplicate_of
+    except BaseException:
+        if parts:
+            parts.abort()
+        if os.path.exists(tmp_filepath):
+            os.remove(tmp_filepath)
+        raise
+    finally:
+        if previous_export:
+            previous_export.close()
+
+    # Files removed or reordered since the last export also count as a change
+    if list(manifest["files"]) != list(previous["files"]):
+        changed = True
+    if report:
+        print_size_report(manifest, report)
+    outputs = [output_filepath, index_path] + ([toc_path] if parts else [])
+    if not changed and all(os.path.exists(path) for path in outputs):
+        os.remove(tmp_filepath)
+        if parts:
+            parts.abort()
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        return False
+
+    os.replace(tmp_filepath, output_filepath)
+    write_index(index_path, output_filename, manifest)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    print(f"Project code exported to {output_filepath} ({reread} read, {reused} reused)")
+    if skipped:
+        print(f"Skipped: {format_skipped(skipped)}")
+    if parts:
+        parts.close()
+        print(f"Split into {len(parts.parts)} parts, table of contents in {toc_path}")
+    return True
+
+
+def watch_project_code(output_filename="project_code_export.txt", interval=2.0, **options):
+    """Keeps the export current by re-running the incremental export on an interval."""
+    print(f"Watching for changes every {interval}s (Ctrl+C to stop)...")
+    export_project_code(output_filename, incremental=True, **options)
+    try:
+        while True:
+            time.sleep(interval)
+            export_project_code(output_filename, incremental=True, **options)
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export project source files into a single text file.")
+    parser.add_argument("-o", "--output", default="project_code_export.txt", help="Output file name")
+    parser.add_argument("--incremental", action="store_true", help="Re-read only files changed since the last export")
+    parser.add_argument("--watch", action="store_true", help="Keep the export current as files change (implies --incremental)")
+    parser.add_argument("--interval", type=float, default=2.0, help="Polling interval for --watch in seconds")
+    parser.add_argument("--gzip", action="store_true", help="Write gzip-compressed output (adds .gz to the name)")
+    parser.add_argument("--workers", type=int, default=READ_WORKERS, help="Number of reader threads")
+    parser.add_argument("--compact", action="store_true", help="Deduplicate identical files and sample large JSON data files")
+    parser.add_argument("--strip-comments", action="store_true", help="Drop comments and blank lines where the language allows it")
+    parser.add_argument("--report", type=int, nargs="?", const=REPORT_TOP, metavar="N",
+                        help=f"Print the N largest files and directories with estimated tokens (default {REPORT_TOP})")
+    parser.add_argument("--no-ignore-files", action="store_true", help="Do not honour .gitignore/.dockerignore patterns")
+    parser.add_argument("--max-file-size", type=int, default=MAX_FILE_SIZE, help="Skip files larger than this many bytes (0 = no limit)")
+    split = parser.add_mutually_exclusive_group()
+    split.add_argument("--max-part-bytes", type=int, help="Also split the export into parts of at most this many bytes")
+    split.add_argument("--max-part-tokens", type=int, help=f"Same, budgeted in estimated tokens (~{BYTES_PER_TOKEN} bytes each)")
+    args = parser.parse_args(argv)
 
-                try:
-                    with open(filepath, "r", encoding="utf-8") as infile:
-                        content = infile.read()
-                        outfile.write(f"--- FILE: {relative_filepath} ---\n")
-                        outfile.write(content)
-                        outfile.write("\n--- END FILE: {relative_filepath} ---\n\n")
-                except Exception as e:
-                    print(f"Could not read file {relative_filepath}: {e}")
+    max_part_bytes = args.max_part_bytes or (args.max_part_tokens * BYTES_PER_TOKEN if args.max_part_tokens else None)
+    if max_part_bytes is not None and max_part_bytes < PART_MIN_BYTES:
+        parser.error(f"parts must be at least {PART_MIN_BYTES} bytes")
+    options = dict(
+        compress=args.gzip, max_part_bytes=max_part_bytes, workers=max(1, args.workers),
+        use_ignore_files=not args.no_ignore_files, max_file_size=args.max_file_size,
+        compact=args.compact, strip_comments=args.strip_comments, report=args.report,
+    )
+    if args.watch:
+        watch_project_code(args.output, args.interval, **options)
+    else:
+        export_project_code(args.output, incremental=args.incremental, **options)
+    return 0
 
-    print(f"Project code exported to {output_filepath}")
 
 if __name__ == "__main__":
-    export_project_code()
+    sys.exit(main())
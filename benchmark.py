@@ -0,0 +1,417 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import contextlib
+import importlib.util
+
+try:
+    import resource  # POSIX only; peak RSS is reported as None elsewhere
+except ImportError:
+    resource = None
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks")
+
+EXPORT_SIZES = [1000, 10000, 100000]
+LOG_RATES = [1000, 10000, 100000]  # Lines per second emitted by the fake child
+LOG_DURATION = 5.0
+EMIT_INTERVAL = 0.01  # The fake child writes one batch of lines this often
+TREE_SEED = 1234
+
+# Synthetic tree mix, as (weight, kind). Sizes are picked per kind in make_file.
+FILE_MIX = [
+    (60, "ts"), (10, "tsx"), (8, "json"), (4, "md"), (3, "css"),
+    (4, "binary"),  # Included extension, but NUL bytes: must be caught by the binary sniff
+    (3, "png"),     # Excluded by extension
+    (4, "ignored"),  # Matched by the tree's .gitignore
+    (4, "duplicate"),  # Same content as a shared template (compact mode dedup)
+]
+LARGE_FILE_EVERY = 5000  # One file above the exporter's stream threshold per this many files
+LARGE_FILE_BYTES = 2 * 1024 * 1024
+FILES_PER_DIR = 50
+
+EXPORT_SCENARIOS = [
+    ("full", {}),
+    ("incremental_unchanged", {"incremental": True}),
+    ("compact", {"compact": True, "strip_comments": True}),
+]
+
+
+def load_exporter():
+    spec = importlib.util.spec_from_file_location("code_export", os.path.join(ROOT_DIR, "CODE EXPORT.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_manager():
+    sys.path.insert(0, ROOT_DIR)
+    import MANAGER
+    return MANAGER
+
+
+def peak_rss_kib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS reports bytes
+
+
+# --- Synthetic project trees ---
+
+SOURCE_TEMPLATE = '''import {{ {name}Service }} from "../services/{name}";
+
+// Generated module {index}
+export interface {name}Options {{
+  id: string;
+  retries: number; // how often to retry
+}}
+
+/* Computes a value for {name}. */
+export function compute{name}(options: {name}Options): number {{
+  const url = "http://example.com/{name}";
+  return options.retries * {index} + url.length;
+}}
+'''
+SHARED_TEMPLATE = '''import * as React from "react"
+
+export function Card(props: React.ComponentProps<"div">) {
+  return <div data-slot="card" {...props} />
+}
+'''
+
+
+def make_file(rng, kind, index):
+    """Returns (relative path suffix, bytes) for one synthetic file of the given kind."""
+    name = f"Mod{index}"
+    if kind in ("ts", "tsx"):
+        body = SOURCE_TEMPLATE.format(name=name, index=index)
+        return f"{name}.{kind}", (body * rng.randint(1, 12)).encode("utf-8")
+    if kind == "json":
+        items = [{"id": i, "symbol": f"SYM{i % 97}", "pnl": round(rng.uniform(-50, 50), 2)} for i in range(rng.randint(5, 400))]
+        return f"{name}.json", json.dumps(items, indent=2).encode("utf-8")
+    if kind == "md":
+        return f"{name}.md", (f"# {name}\n\nNotes for module {index}.\n\n" * rng.randint(1, 20)).encode("utf-8")
+    if kind == "css":
+        return f"{name}.css", (f".c{index} {{ color: #{index % 4096:03x}; }}\n" * rng.randint(5, 80)).encode("utf-8")
+    if kind == "binary":
+        return f"{name}.json", b"\x89PNG\r\n\x1a\n\x00" + rng.randbytes(rng.randint(512, 8192))
+    if kind == "png":
+        return f"{name}.png", rng.randbytes(rng.randint(512, 8192))
+    if kind == "ignored":
+        return f"{name}.gen.ts", SOURCE_TEMPLATE.format(name=name, index=index).encode("utf-8")
+    return f"{name}.tsx", SHARED_TEMPLATE.encode("utf-8")
+
+
+def generate_tree(path, file_count, seed=TREE_SEED):
+    """
+    Writes a reproducible project tree with about ``file_count`` files: mixed
+    source and data files, binaries, ignored files and directories, an
+    excluded node_modules and a few files large enough to be streamed.
+    """
+    rng = random.Random(seed)
+    kinds = [kind for weight, kind in FILE_MIX for _ in range(weight)]
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, ".gitignore"), "w") as f:
+        f.write("# Synthetic ignore rules\n*.gen.ts\nbuild/\n/dist\n")
+    with open(os.path.join(path, "package.json"), "w") as f:
+        json.dump({"name": "synthetic", "version": "1.0.0"}, f)
+
+    # Pruned directories: their files must never be read
+    pruned = max(1, file_count // 20)
+    for directory in ("node_modules/pkg", "build/out", "dist"):
+        os.makedirs(os.path.join(path, directory), exist_ok=True)
+        for i in range(pruned // 3):
+            with open(os.path.join(path, directory, f"f{i}.js"), "w") as f:
+                f.write("module.exports = {};\n")
+
+    for index in range(file_count):
+        directory = os.path.join(path, "src", f"area{index // (FILES_PER_DIR * 20)}", f"pkg{index // FILES_PER_DIR}")
+        if index % FILES_PER_DIR == 0:
+            os.makedirs(directory, exist_ok=True)
+        if index % LARGE_FILE_EVERY == LARGE_FILE_EVERY - 1:
+            name, data = f"Large{index}.ts", SOURCE_TEMPLATE.format(name=f"Large{index}", index=index).encode("utf-8")
+            data = data * (LARGE_FILE_BYTES // len(data))
+        else:
+            name, data = make_file(rng, rng.choice(kinds), index)
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(data)
+
+
+def tree_size(path):
+    files = total = 0
+    for dirpath, _dirnames, filenames in os.walk(path):
+        for filename in filenames:
+            files += 1
+            total += os.path.getsize(os.path.join(dirpath, filename))
+    return files, total
+
+
+# --- Export benchmark ---
+
+def run_export_child(tree, options):
+    """Runs one export in this (fresh) process and returns its measurements."""
+    exporter = load_exporter()
+    os.chdir(tree)
+    baseline = peak_rss_kib()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        rewritten = exporter.export_project_code("export.txt", **options)
+    wall = time.perf_counter() - start
+    output = "export.txt.gz" if options.get("compress") else "export.txt"
+    manifest = exporter.load_manifest(output + exporter.MANIFEST_SUFFIX)
+    return {
+        "wall_s": round(wall, 4),
+        "cpu_s": round(time.process_time() - cpu_start, 4),
+        "baseline_rss_kib": baseline,
+        "peak_rss_kib": peak_rss_kib(),
+        "rewritten": rewritten,
+        "files_exported": len(manifest["files"]),
+        "output_bytes": os.path.getsize(output),
+    }
+
+
+def bench_export(sizes, tree_root=None):
+    results = []
+    base = tree_root or tempfile.mkdtemp(prefix="export-bench-")
+    try:
+        for size in sizes:
+            tree = os.path.join(base, f"tree-{size}")
+            if not os.path.isdir(tree):
+                start = time.perf_counter()
+                generate_tree(tree, size)
+                print(f"Generated {size:,}-file tree in {time.perf_counter() - start:.1f}s")
+            files, total = tree_size(tree)
+            for scenario, options in EXPORT_SCENARIOS:
+                # Each run gets its own interpreter so peak RSS belongs to that run alone
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "export-child", tree, json.dumps(options)],
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                result = dict(json.loads(output), tree_files=size, files_on_disk=files, bytes_on_disk=total, scenario=scenario)
+                results.append(result)
+                print(f"  export {size:>7,} files  {scenario:<22} {result['wall_s']:8.3f}s  "
+                      f"peak {result['peak_rss_kib'] or 0:>8,} KiB  {result['files_exported']:,} exported")
+    finally:
+        if not tree_root:
+            shutil.rmtree(base, ignore_errors=True)
+    return results
+
+
+# --- Log pipeline benchmark ---
+
+def run_emitter(rate, duration):
+    """Fake child process: writes `rate` lines per second, each stamped with its wall-clock send time."""
+    out = sys.stdout
+    sent = 0
+    start = time.time()
+    while True:
+        now = time.time()
+        elapsed = now - start
+        if elapsed >= duration:
+            break
+        target = int(rate * elapsed)
+        if target > sent:
+            out.write("".join(f"{seq} {now:.6f} worker tick payload {seq % 997}\n" for seq in range(sent, target)))
+            out.flush()
+            sent = target
+        time.sleep(EMIT_INTERVAL)
+    out.write(f"DONE {sent}\n")
+    out.flush()
+
+
+def bench_log_pipeline(rates, duration=LOG_DURATION):
+    """
+    Drives ManagerCore's reactor and log pipeline with fake children and a
+    headless stand-in for the GUI tick (ProjectManagerApp.process_queue): every
+    LOG_TICK_MS it drains each tab's ring buffer and builds the insert chunks.
+    Widget insertion itself is not measured.
+    """
+    manager = load_manager()
+    results = []
+    for rate in rates:
+        sink = manager.BufferSink([key for key, _label in manager.LOG_TABS])
+        core = manager.ManagerCore(sinks=[sink])
+        latency = manager.StreamingHistogram()
+        ticks = manager.StreamingHistogram()
+        stalls = manager.StreamingHistogram()
+        state = {"received": 0, "dropped": 0, "expected": None, "exited": threading.Event()}
+        stop = threading.Event()
+
+        def tick_loop():
+            interval = manager.LOG_TICK_MS / 1000
+            last = time.perf_counter()
+            while not stop.is_set():
+                time.sleep(interval)
+                started = time.perf_counter()
+                ticks.add(max(started - last - interval, 0))  # Lateness of the tick itself
+                last = started
+                now = time.time()
+                for buffer in sink.buffers.values():
+                    _cleared, lines, dropped = buffer.drain(manager.LOG_MAX_LINES_PER_TICK)
+                    state["dropped"] += dropped
+                    chunks = []
+                    for message, tag in lines:
+                        chunks.extend((f"{message}\n", tag))
+                        fields = message.split(" ", 2)
+                        if fields[0] == "DONE":
+                            state["expected"] = int(fields[1])
+                        elif len(fields) == 3 and fields[0].isdigit():
+                            state["received"] += 1
+                            latency.add(max(now - float(fields[1]), 0))
+                stalls.add(time.perf_counter() - started)
+
+        ticker = threading.Thread(target=tick_loop, daemon=True)
+        ticker.start()
+        started = time.perf_counter()
+        core.reactor.start("worker", [sys.executable, os.path.abspath(__file__), "emit", str(rate), str(duration)],
+                           on_exit=lambda source, code: state["exited"].set())
+        state["exited"].wait(duration + 60)
+        # Let the ticker drain what is still buffered
+        deadline = time.time() + 10
+        while state["expected"] is None and time.time() < deadline:
+            time.sleep(0.05)
+        time.sleep(manager.LOG_TICK_MS / 1000 * 3)
+        stop.set()
+        ticker.join()
+        core.reactor.shutdown()
+
+        expected = state["expected"] or 0
+        result = {
+            "rate": rate,
+            "duration_s": duration,
+            "wall_s": round(time.perf_counter() - started, 3),
+            "lines_sent": expected,
+            "lines_received": state["received"],
+            "lines_dropped": max(expected - state["received"], 0),
+            "ring_buffer_drops": state["dropped"],
+            "latency_s": histogram_summary(latency),
+            "tick_lateness_s": histogram_summary(ticks),
+            "tick_work_s": histogram_summary(stalls),
+        }
+        results.append(result)
+        print(f"  pipeline {rate:>7,} lines/s  p50 {result['latency_s']['p50'] or 0:.3f}s  "
+              f"p99 {result['latency_s']['p99'] or 0:.3f}s  dropped {result['lines_dropped']:,}  "
+              f"max tick work {result['tick_work_s']['max'] or 0:.4f}s")
+    return results
+
+
+def histogram_summary(histogram):
+    summary = {"count": histogram.count, "max": round(histogram.max, 6) if histogram.count else None}
+    for q in (50, 95, 99):
+        value = histogram.percentile(q)
+        summary[f"p{q}"] = round(value, 6) if value is not None else None
+    return summary
+
+
+# --- Results ---
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(old_path, new_path):
+    """Prints the ratio new/old for each timing and memory figure present in both result files."""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    def rows(results, section, key_fields):
+        return {tuple(item[k] for k in key_fields): item for item in results.get(section, [])}
+
+    for section, key_fields, metrics in (
+        ("export", ("tree_files", "scenario"), ("wall_s", "cpu_s", "peak_rss_kib")),
+        ("log_pipeline", ("rate",), ("latency_s.p50", "latency_s.p99", "tick_work_s.max", "lines_dropped")),
+    ):
+        before, after = rows(old, section, key_fields), rows(new, section, key_fields)
+        for key in sorted(set(before) & set(after)):
+            cells = []
+            for metric in metrics:
+                a, b = lookup(before[key], metric), lookup(after[key], metric)
+                ratio = f"{b / a:.2f}x" if a and b is not None else "-"
+                cells.append(f"{metric} {a} -> {b} ({ratio})")
+            print(f"{section} {'/'.join(str(k) for k in key)}: " + ", ".join(cells))
+
+
+def lookup(item, dotted):
+    for part in dotted.split("."):
+        item = item.get(part) if isinstance(item, dict) else None
+    return item
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for CODE EXPORT.py and the MANAGER.py log pipeline.")
+    commands = parser.add_subparsers(dest="command")
+    run = commands.add_parser("run", help="Run benchmarks and write results to JSON (default)")
+    run.add_argument("suites", nargs="*", metavar="{export,pipeline}", help="Suites to run (default: both)")
+    run.add_argument("--sizes", type=int, nargs="+", default=EXPORT_SIZES, help="Synthetic tree sizes in files")
+    run.add_argument("--rates", type=int, nargs="+", default=LOG_RATES, help="Fake child output rates in lines/s")
+    run.add_argument("--duration", type=float, default=LOG_DURATION, help="Seconds each fake child emits for")
+    run.add_argument("--trees", help="Directory to generate trees in and reuse across runs (default: a temp dir)")
+    run.add_argument("-o", "--output", help="Results file (default: benchmarks/results-<timestamp>.json)")
+    compare_parser = commands.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    # Internal entry points used by the benchmarks themselves
+    child = commands.add_parser("export-child")
+    child.add_argument("tree")
+    child.add_argument("options")
+    emit = commands.add_parser("emit")
+    emit.add_argument("rate", type=int)
+    emit.add_argument("duration", type=float)
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] not in commands.choices and argv[0] not in ("-h", "--help"):
+        argv = ["run"] + argv
+    args = parser.parse_args(argv)
+
+    if args.command == "export-child":
+        print(json.dumps(run_export_child(args.tree, json.loads(args.options))))
+        return 0
+    if args.command == "emit":
+        run_emitter(args.rate, args.duration)
+        return 0
+    if args.command == "compare":
+        compare(args.old, args.new)
+        return 0
+    suites = args.suites or ["export", "pipeline"]
+    unknown = set(suites) - {"export", "pipeline"}
+    if unknown:
+        parser.error(f"unknown suite: {', '.join(sorted(unknown))}")
+    results = {"environment": environment()}
+    if "export" in suites:
+        print("Export benchmark:")
+        results["export"] = bench_export(args.sizes, args.trees)
+    if "pipeline" in suites:
+        print("Log pipeline benchmark:")
+        results["log_pipeline"] = bench_log_pipeline(args.rates, args.duration)
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"results-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import os
+import sys
+import json
+import gzip
+import mmap
+import argparse
+
+DEFAULT_EXPORT = "project_code_export.txt"
+INDEX_SUFFIX = ".index.json"  # Must match INDEX_SUFFIX in "CODE EXPORT.py"
+
+
+class ExportReader:
+    """
+    Random-access reader for project_code_export.txt.
+
+    Uses the sidecar index written by "CODE EXPORT.py" to seek straight to a
+    file's content in a memory-mapped export, so looking up one file does not
+    scan or load the whole export. Gzip exports (``--gzip``) are read through
+    a seekable gzip stream instead, which works but decompresses up to each
+    requested offset.
+
+        with ExportReader("project_code_export.txt") as export:
+            print(export.read("src/core/agents.ts"))
+    """
+
+    def __init__(self, export_path=DEFAULT_EXPORT, index_path=None):
+        self.export_path = export_path
+        self.index_path = index_path or export_path + INDEX_SUFFIX
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        self.entries = {entry["path"]: entry for entry in index["files"]}
+        self._file = open(export_path, "rb")
+        self._map = b""
+        if index.get("compressed"):
+            self._map = None
+            self._gzip = gzip.GzipFile(fileobj=self._file)
+        elif os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        elif self._map is None:
+            self._gzip.close()
+        self._file.close()
+
+    def __contains__(self, path):
+        return self._key(path) in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def list_files(self, prefix=None, language=None):
+        """Returns exported paths in export order, optionally filtered."""
+        return [
+            path for path, entry in self.entries.items()
+            if (prefix is None or path.startswith(prefix)) and (language is None or entry["language"] == language)
+        ]
+
+    def info(self, path):
+        """Returns the index entry (offsets, length, sha256, language) for one file."""
+        return self.entries[self._key(path)]
+
+    def read_bytes(self, path):
+        entry = self.info(path)
+        return self._read_range(entry["content_offset"], entry["content_length"])
+
+    def read(self, path):
+        return self.read_bytes(path).decode("utf-8")
+
+    def read_section(self, path):
+        """Returns the full block for one file, including its FILE/END FILE markers."""
+        entry = self.info(path)
+        return self._read_range(entry["offset"], entry["length"]).decode("utf-8")
+
+    def iter_files(self, paths=None, prefix=None, language=None):
+        """Yields (path, content) for a subset of files without materialising the rest."""
+        for path in (paths if paths is not None else self.list_files(prefix, language)):
+            yield self._key(path), self.read(path)
+
+    def _read_range(self, start, length):
+        if self._map is None:
+            self._gzip.seek(start)
+            return self._gzip.read(length)
+        return self._map[start:start + length]
+
+    @staticmethod
+    def _key(path):
+        return path.replace("\\", "/")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Look up files in an indexed project code export.")
+    parser.add_argument("-e", "--export", default=DEFAULT_EXPORT, help="Export file to read")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_parser = commands.add_parser("list", help="List exported files")
+    list_parser.add_argument("--prefix")
+    list_parser.add_argument("--language")
+    show_parser = commands.add_parser("show", help="Print the content of one or more files")
+    show_parser.add_argument("paths", nargs="+")
+    args = parser.parse_args(argv)
+
+    with ExportReader(args.export) as export:
+        if args.command == "list":
+            for path in export.list_files(args.prefix, args.language):
+                entry = export.info(path)
+                print(f"{entry['content_length']:>9}  {entry['language']:<11} {path}")
+        else:
+            for path in args.paths:
+                if path not in export:
+                    print(f"Not in export: {path}", file=sys.stderr)
+                    return 1
+                sys.stdout.write(export.read(path))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())